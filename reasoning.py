@@ -1,6 +1,6 @@
 import os
 from typing import Tuple
-from rdflib import Graph, Namespace, RDF, RDFS, Literal
+from rdflib import Graph, Namespace, RDF, RDFS, Literal, URIRef
 
 ###################################################################################
 
@@ -36,7 +36,8 @@ def apply_reasoning(g: Graph, EX: Namespace) -> Graph:
                 inferred_graph.add((s, p, sc))
     # Infer country based on country_code
     for city, _, country_code in g.triples((None, EX.country_code, None)):
-        for country, _, code in g.triples((None, EX.iso, country_code)):
+        country = URIRef(f"{EX.country_info}{country_code}")
+        if (country, RDF.type, EX.country_info) in g:
             inferred_graph.add((city, EX.located_in, country))
     return inferred_graph
 
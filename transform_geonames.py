@@ -1,257 +1,449 @@
 import os
-import pandas as pd
-from rdflib import Graph, Literal, RDF, URIRef, Namespace
-from typing import Dict, Tuple
+import re
+import shutil
+import subprocess
+import tempfile
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv
+from rdflib import Graph, RDF, URIRef, Namespace, XSD
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+from typing import BinaryIO, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
 
 ###################################################################################
 
 DATA_FOLDER = os.path.join("data", "geonames")
 FEATURES_FOLDER = os.path.join(DATA_FOLDER, "features")
+NT_OUTPUT_FILE = os.path.join("data", "geonames.nt")
 OUTPUT_FILE = os.path.join("data", "geonames.rdf")
+CONVERT_TO_XML = True
+USE_RAPPER = True
+USE_OXIGRAPH = True
 VERBOSE = True
+# None reads whole files, they are streamed in READ_BLOCK_SIZE chunks
 LINE_LIMIT = 1000
 LINE_LIMIT_FEATURE = 100
+READ_BLOCK_SIZE = 8 << 20
+WRITE_BUFFER_SIZE = 1 << 20
+
+EX = Namespace("http://example.org/geonames/")
+FEATURE_FILE_PATTERN = re.compile(r"[A-Z]{2}\.txt")
+
+# N-Triples string escapes (\\, ", newlines, tabs), the backslash must go first
+NT_ESCAPES = [
+    ("\\", "\\\\"),
+    ('"', '\\"'),
+    ("\n", "\\n"),
+    ("\r", "\\r"),
+    ("\t", "\\t")
+]
+
+# characters N-Triples does not allow inside an <IRI>, percent-encoded in subject ids
+IRI_UNSAFE = r'[\s<>"{}|^`\\]'
+IRI_ESCAPES = [
+    (" ", "%20"),
+    ("\t", "%09"),
+    ("\n", "%0A"),
+    ("\r", "%0D"),
+    ("<", "%3C"),
+    (">", "%3E"),
+    ('"', "%22"),
+    ("{", "%7B"),
+    ("}", "%7D"),
+    ("|", "%7C"),
+    ("^", "%5E"),
+    ("`", "%60"),
+    ("\\", "%5C")
+]
 
 ###################################################################################
 
+# classes and predicates are resolved once here instead of on every process_* call
+
+RDF_TYPE = RDF.type
+
+# literal datatypes, strings stay plain literals
+STRING = None
+INTEGER = XSD.integer
+DECIMAL = XSD.decimal
+DOUBLE = XSD.double
+
+ADMIN1_COLUMNS = ["code", "name", "name_ascii", "geoname_id"]
+ADMIN2_COLUMNS = ["code", "name", "ascii_name", "geoname_id"]
+ADMIN5_COLUMNS = ["geoname_id", "adm5code"]
+ALTERNATE_NAME_COLUMNS = ["alternateNameId", "geoname_id", "iso_language", "alternate_name"]# "is_preferred_name", "is_short_name", "is_colloquial", "is_historic", "from", "to"]
+GEONAME_COLUMNS = [
+    "geoname_id", "name", "ascii_name", "alternate_names", "latitude", "longitude",
+    "feature_class", "feature_code", "country_code", "cc2", "admin1_code", "admin2_code",
+    "admin3_code", "admin4_code", "population", "elevation", "dem", "timezone", "modification_date"
+]
+COUNTRY_INFO_COLUMNS = ["iso", "iso3", "iso-numeric", "fips", "country", "capital", "area_in_sq_km", "population", "continent", "tld", "currency_code", "currency_name", "phone", "postal_code_format"]# "Postal Code Regex", "Languages", "geoname_id", "neighbours", "EquivalentFipsCode"]
+FEATURE_CODE_COLUMNS = ["code", "name", "description"]
+HIERARCHY_COLUMNS = ["parent_id", "child_id", "type"]
+ISO_LANGUAGE_CODE_COLUMNS = ["iso_639_3", "iso_639_2", "iso_639_1", "language_name"]
+TIME_ZONE_COLUMNS = ["country_code", "time_zone_id", "gmt_offset_1_jan_2025", "dst_offset_1_jul_2025", "raw_offset_independant_of_dst"]
+
+ADMIN1_CLASS = EX.admin1_code
+ADMIN1_PROPS = {
+    EX.code: ("code", STRING),
+    EX.name: ("name", STRING),
+    EX.name_ascii: ("name_ascii", STRING),
+    EX.geoname_id: ("geoname_id", STRING)
+}
+
+ADMIN2_CLASS = EX.admin2_code
+ADMIN2_PROPS = {
+    EX.code: ("code", STRING),
+    EX.name: ("name", STRING),
+    EX.ascii_name: ("ascii_name", STRING),
+    EX.geoname_id: ("geoname_id", STRING)
+}
+
+ADMIN5_CLASS = EX.admin5_code
+ADMIN5_PROPS = {
+    EX.geoname_id: ("geoname_id", STRING),
+    EX.adm5code: ("adm5code", STRING)
+}
+
+ALTERNATE_NAME_CLASS = EX.alternate_name
+ALTERNATE_NAME_PROPS = {
+    EX.alternate_name_id: ("alternateNameId", STRING),
+    EX.geoname_id: ("geoname_id", STRING),
+    EX.iso_language: ("iso_language", STRING),
+    EX.alternate_name: ("alternate_name", STRING)
+}
+
+# cities and per-country features share the geoname table layout
+CITY_CLASS = EX.city
+FEATURE_CLASS = EX.feature
+GEONAME_PROPS = {
+    EX.geoname_id: ("geoname_id", STRING),
+    EX.name: ("name", STRING),
+    EX.ascii_name: ("ascii_name", STRING),
+    EX.alternate_names: ("alternate_names", STRING),
+    EX.latitude: ("latitude", DECIMAL),
+    EX.longitude: ("longitude", DECIMAL),
+    EX.feature_class: ("feature_class", STRING),
+    EX.feature_code: ("feature_code", STRING),
+    EX.country_code: ("country_code", STRING),
+    EX.cc2: ("cc2", STRING),
+    EX.admin1_code: ("admin1_code", STRING),
+    EX.admin2_code: ("admin2_code", STRING),
+    EX.admin3_code: ("admin3_code", STRING),
+    EX.admin4_code: ("admin4_code", STRING),
+    EX.population: ("population", INTEGER),
+    EX.elevation: ("elevation", INTEGER),
+    EX.dem: ("dem", INTEGER),
+    EX.timezone: ("timezone", STRING),
+    EX.modification_date: ("modification_date", STRING)
+}
+
+COUNTRY_INFO_CLASS = EX.country_info
+# the iso code is the subject id (country_info<ISO>), no separate ex:iso triple
+COUNTRY_INFO_PROPS = {
+    EX.iso3: ("iso3", STRING),
+    EX.iso_numeric: ("iso-numeric", INTEGER),
+    EX.fips: ("fips", STRING),
+    EX.country: ("country", STRING),
+    EX.capital: ("capital", STRING),
+    # geonames writes some areas in exponent form (1.71E7), which xsd:decimal rejects
+    EX.area_in_sq_km: ("area_in_sq_km", DOUBLE),
+    EX.population: ("population", INTEGER),
+    EX.continent: ("continent", STRING),
+    EX.tld: ("tld", STRING),
+    EX.currency_code: ("currency_code", STRING),
+    EX.currency_name: ("currency_name", STRING),
+    EX.phone: ("phone", STRING),
+    EX.postal_code_format: ("postal_code_format", STRING),
+    # EX.postal_code_regex: ("Postal Code Regex", STRING),
+    # EX.languages: ("Languages", STRING),
+    # EX.geoname_id: ("geoname_id", STRING),
+    # EX.neighbours: ("neighbours", STRING),
+    # EX.equivalent_fips_code: ("EquivalentFipsCode", STRING)
+}
+
+FEATURE_CODE_CLASS = EX.feature_code
+FEATURE_CODE_PROPS = {
+    EX.code: ("code", STRING),
+    EX.name: ("name", STRING),
+    EX.description: ("description", STRING)
+}
+
+HIERARCHY_CLASS = EX.hierarchy
+HIERARCHY_PROPS = {
+    EX.parent_id: ("parent_id", STRING),
+    EX.child_id: ("child_id", STRING),
+    EX.type: ("type", STRING)
+}
+
+ISO_LANGUAGE_CODE_CLASS = EX.iso_language_code
+ISO_LANGUAGE_CODE_PROPS = {
+    EX.iso_639_3: ("iso_639_3", STRING),
+    EX.iso_639_2: ("iso_639_2", STRING),
+    EX.iso_639_1: ("iso_639_1", STRING),
+    EX.language_name: ("language_name", STRING)
+}
+
+TIME_ZONE_CLASS = EX.time_zone
+TIME_ZONE_PROPS = {
+    EX.country_code: ("country_code", STRING),
+    EX.timezone_id: ("time_zone_id", STRING),
+    EX.gmt_offset: ("gmt_offset_1_jan_2025", DECIMAL),
+    EX.dst_offset: ("dst_offset_1_jul_2025", DECIMAL),
+    EX.raw_offset: ("raw_offset_independant_of_dst", DECIMAL)
+}
+
+###################################################################################
+
+
+def escape(values: pa.Array) -> pa.Array:
+    for pattern, replacement in NT_ESCAPES:
+        values = pc.replace_substring(values, pattern, replacement)
+    return values
+
+
+def iri_escape(values: pa.Array) -> pa.Array:
+    # ids are almost always safe, only pay for the replace passes when one is not
+    if not pc.any(pc.match_substring_regex(values, IRI_UNSAFE)).as_py():
+        return values
+    for pattern, replacement in IRI_ESCAPES:
+        values = pc.replace_substring(values, pattern, replacement)
+    return values
+
+
+def write_lines(out: BinaryIO, lines: pa.Array) -> None:
+    # null lines come from null values, the rest is joined and its utf-8 buffer written as is
+    lines = pc.drop_null(lines)
+    if len(lines):
+        out.write(pc.binary_join(pa.ListArray.from_arrays([0, len(lines)], lines), "")[0].as_buffer())
+
+
+def count_comment_lines(file_path: str) -> int:
+    # pyarrow has no comment option, geonames only comments the top of a file
+    count = 0
+    with open(file_path, encoding="utf-8") as file:
+        for line in file:
+            if not line.startswith("#"):
+                break
+            count += 1
+    return count
+
+
+def read_chunks(file_path: str, columns: List[str], nrows: Optional[int], skiprows: int = 0) -> Iterator[pa.RecordBatch]:
+    # everything is written as a string literal, skip dtype inference and unused columns
+    names = [f"f{i}" for i in range(len(columns))]
+    reader = csv.open_csv(
+        file_path,
+        read_options=csv.ReadOptions(
+            skip_rows=count_comment_lines(file_path) + skiprows,
+            autogenerate_column_names=True,
+            block_size=READ_BLOCK_SIZE,
+            # parallelism comes from the process pool, one file per worker
+            use_threads=False),
+        parse_options=csv.ParseOptions(
+            delimiter='\t',
+            quote_char=False,
+            invalid_row_handler=lambda row: 'skip'),
+        convert_options=csv.ConvertOptions(
+            include_columns=names,
+            column_types={name: pa.string() for name in names},
+            null_values=[''],
+            strings_can_be_null=True))
+
+    # one record batch at a time, peak memory is bounded by READ_BLOCK_SIZE instead of the file size
+    remaining = nrows
+    try:
+        for batch in reader:
+            if remaining is not None:
+                batch = batch.slice(0, remaining)
+                remaining -= batch.num_rows
+            yield pa.RecordBatch.from_arrays(batch.columns, names=columns)
+            # stop before the reader pulls and parses the next block
+            if remaining is not None and remaining <= 0:
+                break
+    finally:
+        reader.close()
+
+
+def add_triples(out: BinaryIO, batch: pa.RecordBatch, subject_class: URIRef, subject_prefix: str, properties: Dict[URIRef, Tuple[str, Optional[URIRef]]], id_column: str) -> None:
+    # write N-Triples lines directly, the graph is never queried before serialization
+    # lines are built a column at a time with arrow compute kernels, nothing is boxed per row
+    batch = batch.filter(pc.is_valid(batch.column(id_column)))
+    subjects = pc.binary_join_element_wise(f"<{subject_prefix}", iri_escape(batch.column(id_column)), ">", "")
+    write_lines(out, pc.binary_join_element_wise(subjects, f" <{RDF_TYPE}> <{subject_class}> .\n", ""))
+    for prop, (col, datatype) in properties.items():
+        suffix = f"\"^^<{datatype}> .\n" if datatype else "\" .\n"
+        write_lines(out, pc.binary_join_element_wise(
+            subjects, f" <{prop}> \"", escape(batch.column(col)), suffix, ""))
+
+
+def process_admin1_codes(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, ADMIN1_CLASS, ADMIN1_CLASS, ADMIN1_PROPS, "code")
+
+
+def process_admin2_codes(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, ADMIN2_CLASS, ADMIN2_CLASS, ADMIN2_PROPS, "code")
+
+
+def process_admin5_codes(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, ADMIN5_CLASS, ADMIN5_CLASS, ADMIN5_PROPS, "geoname_id")
+
+
+def process_alternate_names(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, ALTERNATE_NAME_CLASS, ALTERNATE_NAME_CLASS, ALTERNATE_NAME_PROPS, "alternateNameId")
+
+
+def process_cities(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, CITY_CLASS, CITY_CLASS, GEONAME_PROPS, "geoname_id")
 
-def create_graph() -> Tuple[Graph, Namespace]:
-    g = Graph()
-    EX = Namespace("http://example.org/geonames/")
-    g.bind("ex", EX)
-    return g, EX
-
-
-def add_triples(g: Graph, df: pd.DataFrame, subject_class: URIRef, subject_prefix: str, properties: Dict[URIRef, str], id_column: str) -> None:
-    for _, row in df.iterrows():
-        subject = URIRef(f"{subject_prefix}{row[id_column]}")
-        g.add((subject, RDF.type, subject_class))
-        for prop, col in properties.items():
-            if pd.notna(row[col]):
-                g.add((subject, prop, Literal(row[col])))
-
-
-def process_admin1_codes(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.admin1_code, EX.admin1_code, {
-        EX.code: "code",
-        EX.name: "name",
-        EX.name_ascii: "name_ascii",
-        EX.geoname_id: "geoname_id"
-    }, "code")
-
-
-def process_admin2_codes(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.admin2_code, EX.admin2_code, {
-        EX.code: "code",
-        EX.name: "name",
-        EX.ascii_name: "ascii_name",
-        EX.geoname_id: "geoname_id"
-    }, "code")
-
-
-def process_admin5_codes(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.admin5_code, EX.admin5_code, {
-        EX.geoname_id: "geoname_id",
-        EX.adm5code: "adm5code"
-    }, "geoname_id")
-
-
-def process_alternate_names(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.alternate_name, EX.alternate_name, {
-        EX.alternate_name_id: "alternateNameId",
-        EX.geoname_id: "geoname_id",
-        EX.iso_language: "iso_language",
-        EX.alternate_name: "alternate_name"
-    }, "alternateNameId")
-
-
-def process_cities(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.city, EX.city, {
-        EX.geoname_id: "geoname_id",
-        EX.name: "name",
-        EX.ascii_name: "ascii_name",
-        EX.alternate_names: "alternate_names",
-        EX.latitude: "latitude",
-        EX.longitude: "longitude",
-        EX.feature_class: "feature_class",
-        EX.feature_code: "feature_code",
-        EX.country_code: "country_code",
-        EX.cc2: "cc2",
-        EX.admin1_code: "admin1_code",
-        EX.admin2_code: "admin2_code",
-        EX.admin3_code: "admin3_code",
-        EX.admin4_code: "admin4_code",
-        EX.population: "population",
-        EX.elevation: "elevation",
-        EX.dem: "dem",
-        EX.timezone: "timezone",
-        EX.modification_date: "modification_date"
-    }, "geoname_id")
-
-
-def process_country_info(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.country_info, EX.country_info, {
-        EX.iso: "iso",
-        EX.iso3: "iso3",
-        EX.iso_numeric: "iso-numeric",
-        EX.fips: "fips",
-        EX.country: "country",
-        EX.capital: "capital",
-        EX.area_in_sq_km: "area_in_sq_km",
-        EX.population: "population",
-        EX.continent: "continent",
-        EX.tld: "tld",
-        EX.currency_code: "currency_code",
-        EX.currency_name: "currency_name",
-        EX.phone: "phone",
-        EX.postal_code_format: "postal_code_format",
-        # EX.postal_code_regex: "Postal Code Regex",
-        # EX.languages: "Languages",
-        # EX.geoname_id: "geoname_id",
-        # EX.neighbours: "neighbours",
-        # EX.equivalent_fips_code: "EquivalentFipsCode"
-    }, "iso")
-
-
-def process_feature_codes(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.feature_code, EX.feature_code, {
-        EX.code: "code",
-        EX.name: "name",
-        EX.description: "description"
-    }, "code")
-
-
-def process_hierarchy(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.hierarchy, EX.hierarchy, {
-        EX.parent_id: "parent_id",
-        EX.child_id: "child_id",
-        EX.type: "type"
-    }, "parent_id")
-
-
-def process_iso_language_codes(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    df.columns = [col.replace(" ", "_") for col in df.columns]
-    add_triples(g, df, EX.iso_language_code, EX.iso_language_code, {
-        EX.iso_639_3: "iso_639_3",
-        EX.iso_639_2: "iso_639_2",
-        EX.iso_639_1: "iso_639_1",
-        EX.language_name: "language_name"
-    }, "iso_639_3")
-
-
-def process_time_zones(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.time_zone, EX.time_zone, {
-        EX.country_code: "country_code",
-        EX.timezone_id: "time_zone_id",
-        EX.gmt_offset: "gmt_offset_1_jan_2025",
-        EX.dst_offset: "dst_offset_1_jul_2025",
-        EX.raw_offset: "raw_offset_independant_of_dst"
-    }, "country_code")
-
-
-def process_features(g: Graph, EX: Namespace, file_path: str) -> None:
-    df = pd.read_csv(file_path, delimiter='\t', header=None, names=[
-        "geoname_id", "name", "ascii_name", "alternate_names", "latitude", "longitude",
-        "feature_class", "feature_code", "country_code", "cc2", "admin1_code", "admin2_code",
-        "admin3_code", "admin4_code", "population", "elevation", "dem", "timezone", "modification_date"
-    ], nrows=LINE_LIMIT_FEATURE, comment='#', on_bad_lines='skip')
-    
-    add_triples(g, df, EX.feature, EX.feature, {
-        EX.geoname_id: "geoname_id",
-        EX.name: "name",
-        EX.ascii_name: "ascii_name",
-        EX.alternate_names: "alternate_names",
-        EX.latitude: "latitude",
-        EX.longitude: "longitude",
-        EX.feature_class: "feature_class",
-        EX.feature_code: "feature_code",
-        EX.country_code: "country_code",
-        EX.cc2: "cc2",
-        EX.admin1_code: "admin1_code",
-        EX.admin2_code: "admin2_code",
-        EX.admin3_code: "admin3_code",
-        EX.admin4_code: "admin4_code",
-        EX.population: "population",
-        EX.elevation: "elevation",
-        EX.dem: "dem",
-        EX.timezone: "timezone",
-        EX.modification_date: "modification_date"
-    }, "geoname_id")
+
+def process_country_info(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, COUNTRY_INFO_CLASS, COUNTRY_INFO_CLASS, COUNTRY_INFO_PROPS, "iso")
+
+
+def process_feature_codes(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, FEATURE_CODE_CLASS, FEATURE_CODE_CLASS, FEATURE_CODE_PROPS, "code")
+
+
+def process_hierarchy(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, HIERARCHY_CLASS, HIERARCHY_CLASS, HIERARCHY_PROPS, "parent_id")
+
+
+def process_iso_language_codes(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, ISO_LANGUAGE_CODE_CLASS, ISO_LANGUAGE_CODE_CLASS, ISO_LANGUAGE_CODE_PROPS, "iso_639_3")
+
+
+def process_time_zones(out: BinaryIO, batch: pa.RecordBatch) -> None:
+    add_triples(out, batch, TIME_ZONE_CLASS, TIME_ZONE_CLASS, TIME_ZONE_PROPS, "country_code")
+
+
+def process_features(out: BinaryIO, file_path: str) -> None:
+    for batch in read_chunks(file_path, GEONAME_COLUMNS, LINE_LIMIT_FEATURE):
+        add_triples(out, batch, FEATURE_CLASS, FEATURE_CLASS, GEONAME_PROPS, "geoname_id")
+
+
+# file name -> (processor, columns, header lines to skip)
+DISPATCH: Mapping[str, Tuple[Callable[[BinaryIO, pa.RecordBatch], None], List[str], int]] = MappingProxyType({
+    "admin1CodesASCII.txt": (process_admin1_codes, ADMIN1_COLUMNS, 0),
+    "admin2Codes.txt": (process_admin2_codes, ADMIN2_COLUMNS, 0),
+    "adminCode5.txt": (process_admin5_codes, ADMIN5_COLUMNS, 0),
+    "alternateNamesV2.txt": (process_alternate_names, ALTERNATE_NAME_COLUMNS, 0),
+    **{name: (process_cities, GEONAME_COLUMNS, 0)
+       for name in ("cities500.txt", "cities1000.txt", "cities5000.txt", "cities15000.txt")},
+    "countryInfo.txt": (process_country_info, COUNTRY_INFO_COLUMNS, 0),
+    "featureCodes_en.txt": (process_feature_codes, FEATURE_CODE_COLUMNS, 0),
+    "hierarchy.txt": (process_hierarchy, HIERARCHY_COLUMNS, 0),
+    # these two start with a column header rather than a comment
+    "iso-languagecodes.txt": (process_iso_language_codes, ISO_LANGUAGE_CODE_COLUMNS, 1),
+    "timeZones.txt": (process_time_zones, TIME_ZONE_COLUMNS, 1)
+})
 
 ###################################################################################
 
 
-def process_file(g: Graph, EX: Namespace, file_name: str, file_path: str) -> None:
+def process_file(out: BinaryIO, file_name: str, file_path: str) -> None:
     if VERBOSE:
         print(f"Processing {file_name}...")
 
-    file_columns = {
-        "admin1CodesASCII.txt": ["code", "name", "name_ascii", "geoname_id"],
-        "admin2Codes.txt": ["code", "name", "ascii_name", "geoname_id"],
-        "adminCode5.txt": ["geoname_id", "adm5code"],
-        "alternateNamesV2.txt": ["alternateNameId", "geoname_id", "iso_language", "alternate_name", "is_preferred_name", "is_short_name", "is_colloquial", "is_historic", "from", "to"],
-        "cities500.txt": ["geoname_id", "name", "ascii_name", "alternate_names", "latitude", "longitude", "feature_class", "feature_code", "country_code", "cc2", "admin1_code", "admin2_code", "admin3_code", "admin4_code", "population", "elevation", "dem", "timezone", "modification_date"],
-        "cities1000.txt": ["geoname_id", "name", "ascii_name", "alternate_names", "latitude", "longitude", "feature_class", "feature_code", "country_code", "cc2", "admin1_code", "admin2_code", "admin3_code", "admin4_code", "population", "elevation", "dem", "timezone", "modification_date"],
-        "cities5000.txt": ["geoname_id", "name", "ascii_name", "alternate_names", "latitude", "longitude", "feature_class", "feature_code", "country_code", "cc2", "admin1_code", "admin2_code", "admin3_code", "admin4_code", "population", "elevation", "dem", "timezone", "modification_date"],
-        "cities15000.txt": ["geoname_id", "name", "ascii_name", "alternate_names", "latitude", "longitude", "feature_class", "feature_code", "country_code", "cc2", "admin1_code", "admin2_code", "admin3_code", "admin4_code", "population", "elevation", "dem", "timezone", "modification_date"],
-        "countryInfo.txt": ["iso", "iso3", "iso-numeric", "fips", "country", "capital", "area_in_sq_km", "population", "continent", "tld", "currency_code", "currency_name", "phone", "postal_code_format"],# "Postal Code Regex", "Languages", "geoname_id", "neighbours", "EquivalentFipsCode"],
-        "featureCodes_en.txt": ["code", "name", "description"],
-        "hierarchy.txt": ["parent_id", "child_id", "type"],
-        "iso-languagecodes.txt": ["iso_639_3", "iso_639_2", "iso_639_1", "language_name"],
-        "timeZones.txt": ["country_code", "time_zone_id", "gmt_offset_1_jan_2025", "dst_offset_1_jul_2025", "raw_offset_independant_of_dst"]
-    }
-
-    if file_name in file_columns:
-        df = pd.read_csv(file_path, delimiter='\t', nrows=LINE_LIMIT, header=None, comment='#', on_bad_lines='skip')
-        df.columns = file_columns[file_name]
-        match file_name:
-            case "admin1CodesASCII.txt":
-                process_admin1_codes(g, EX, df)
-            case "admin2Codes.txt":
-                process_admin2_codes(g, EX, df)
-            case "adminCode5.txt":
-                process_admin5_codes(g, EX, df)
-            case "alternateNamesV2.txt":
-                process_alternate_names(g, EX, df)
-            case "cities500.txt" | "cities1000.txt" | "cities5000.txt" | "cities15000.txt":
-                process_cities(g, EX, df)
-            case "countryInfo.txt":
-                process_country_info(g, EX, df)
-            case "featureCodes_en.txt":
-                process_feature_codes(g, EX, df)
-            case "hierarchy.txt":
-                process_hierarchy(g, EX, df)
-            case "iso-languagecodes.txt":
-                df = df.drop(0)
-                process_iso_language_codes(g, EX, df)
-            case "timeZones.txt":
-                process_time_zones(g, EX, df)
-    else:
-        if VERBOSE:
-            print(f"File {file_name} not recognized, skipping.")
+    process, columns, skiprows = DISPATCH[file_name]
+    for batch in read_chunks(file_path, columns, LINE_LIMIT, skiprows):
+        process(out, batch)
+
+
+def skip_fragment(file_name: str, fragment_path: str, error: Exception) -> None:
+    # one unreadable table must not abort the whole pool, its fragment is left empty
+    print(f"File {file_name} could not be read, skipping: {error}")
+    open(fragment_path, "wb").close()
+
 
+def process_file_to_nt(file_name: str, file_path: str, fragment_path: str) -> str:
+    try:
+        with open(fragment_path, "wb", buffering=WRITE_BUFFER_SIZE) as out:
+            process_file(out, file_name, file_path)
+    except (pa.ArrowInvalid, KeyError) as error:
+        skip_fragment(file_name, fragment_path, error)
+    return fragment_path
 
-def process_feature_files(g: Graph, EX: Namespace) -> None:
+
+def process_feature_file_to_nt(file_name: str, file_path: str, fragment_path: str) -> str:
     if VERBOSE:
-        print("Processing feature folder")
-    for file_name in sorted(os.listdir(FEATURES_FOLDER)):
-        if VERBOSE:
-            print(f"{file_name}, ", end="", flush=True)
-        file_path = os.path.join(FEATURES_FOLDER, file_name)
-        if file_name.endswith(".txt"):
-            process_features(g, EX, file_path)
+        print(f"Processing feature {file_name}...")
+    try:
+        with open(fragment_path, "wb", buffering=WRITE_BUFFER_SIZE) as out:
+            process_features(out, file_path)
+    except (pa.ArrowInvalid, KeyError) as error:
+        skip_fragment(file_name, fragment_path, error)
+    return fragment_path
 
 ###################################################################################
 
 
+def concatenate_fragments(fragment_paths: List[str], output_file: str) -> None:
+    with open(output_file, "wb") as out:
+        for fragment_path in fragment_paths:
+            with open(fragment_path, "rb") as fragment:
+                shutil.copyfileobj(fragment, out, WRITE_BUFFER_SIZE)
+
+
+def convert_to_xml() -> None:
+    # data/geonames.nt is the primary output, RDF/XML is only kept for merge_rdf.py and the queries
+    if USE_RAPPER and shutil.which("rapper"):
+        # raptor streams N-Triples to RDF/XML without building a graph
+        # it writes next to the output and only replaces it on success, a failed run keeps the previous file
+        tmp_file = f"{OUTPUT_FILE}.tmp"
+        try:
+            with open(tmp_file, "wb") as out:
+                subprocess.run(["rapper", "-q", "-i", "ntriples", "-o", "rdfxml",
+                                "-f", f'xmlns:ex="{EX}"', NT_OUTPUT_FILE], stdout=out, check=True)
+            os.replace(tmp_file, OUTPUT_FILE)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+    elif USE_OXIGRAPH:
+        # oxrdflib bulk loads the N-Triples file into the Rust store
+        g = Graph(store="Oxigraph")
+        g.bind("ex", EX)
+        g.parse(NT_OUTPUT_FILE, format="ox-nt")
+        g.serialize(destination=OUTPUT_FILE, format="ox-xml")
+    else:
+        g = Graph()
+        g.bind("ex", EX)
+        g.parse(NT_OUTPUT_FILE, format="nt")
+        g.serialize(destination=OUTPUT_FILE, format='xml')
+
+
 def main():
-    g, EX = create_graph()
-    for file_name in os.listdir(DATA_FOLDER):
-        file_path = os.path.join(DATA_FOLDER, file_name)
-        process_file(g, EX, file_name, file_path)
-    process_feature_files(g, EX)
-    print("serialize...")
-    g.serialize(destination=OUTPUT_FILE, format='xml')
+    present = {name for name in os.listdir(DATA_FOLDER) if os.path.isfile(os.path.join(DATA_FOLDER, name))}
+    if VERBOSE:
+        for file_name in sorted(present - DISPATCH.keys()):
+            print(f"File {file_name} not recognized, skipping.")
+    # largest dumps first so the long jobs start early on the process pool
+    file_names = sorted(present & DISPATCH.keys(),
+                        key=lambda name: os.path.getsize(os.path.join(DATA_FOLDER, name)), reverse=True)
+    # only the XX.txt country dumps, the zips also ship a readme.txt
+    feature_names = sorted((name for name in os.listdir(FEATURES_FOLDER) if FEATURE_FILE_PATTERN.fullmatch(name)),
+                           key=lambda name: os.path.getsize(os.path.join(FEATURES_FOLDER, name)), reverse=True)
+
+    # files are independent, each worker writes its own N-Triples fragment
+    with tempfile.TemporaryDirectory() as fragment_folder:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            file_fragments = executor.map(
+                process_file_to_nt,
+                file_names,
+                [os.path.join(DATA_FOLDER, name) for name in file_names],
+                [os.path.join(fragment_folder, f"{name}.nt") for name in file_names])
+            feature_fragments = executor.map(
+                process_feature_file_to_nt,
+                feature_names,
+                [os.path.join(FEATURES_FOLDER, name) for name in feature_names],
+                [os.path.join(fragment_folder, f"feature_{name}.nt") for name in feature_names])
+            fragment_paths = list(file_fragments) + list(feature_fragments)
+        concatenate_fragments(fragment_paths, NT_OUTPUT_FILE)
+
+    if CONVERT_TO_XML:
+        print("serialize...")
+        convert_to_xml()
     print("done")
 
 
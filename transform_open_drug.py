@@ -1,7 +1,8 @@
+import io
 import os
 import pandas as pd
-from rdflib import Graph, Literal, RDF, URIRef, Namespace
-from typing import Dict, Tuple
+from rdflib import Graph, RDF, URIRef, Namespace, XSD
+from typing import Dict, TextIO, Tuple
 
 ###################################################################################
 
@@ -10,6 +11,22 @@ OUTPUT_FILE = os.path.join("data", "open_drug.rdf")
 VERBOSE = True
 LINE_LIMIT = 10000
 
+# N-Triples string escapes (\\, ", newlines, tabs)
+NT_ESCAPE_TABLE = str.maketrans({
+    "\\": "\\\\",
+    '"': '\\"',
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t"
+})
+
+# datatypes rdflib's Literal infers from the pandas column dtypes
+NT_DATATYPE_SUFFIX = {
+    "i": f"^^<{XSD.integer}>",
+    "u": f"^^<{XSD.integer}>",
+    "f": f"^^<{XSD.double}>"
+}
+
 ###################################################################################
 
 
@@ -20,49 +37,60 @@ def create_graph() -> Tuple[Graph, Namespace]:
     return g, EX
 
 
-def add_triples(g: Graph, df: pd.DataFrame, subject_class: URIRef, subject_prefix: str, properties: Dict[URIRef, str]) -> None:
-    for _, row in df.iterrows():
-        subject = URIRef(f"{subject_prefix}{row['id']}")
-        g.add((subject, RDF.type, subject_class))
-        for prop, col in properties.items():
-            if pd.notna(row[col]):
-                g.add((subject, prop, Literal(row[col])))
+def add_triples(buf: TextIO, df: pd.DataFrame, subject_class: URIRef, subject_prefix: str, properties: Dict[URIRef, str]) -> None:
+    # N-Triples lines are buffered and parsed once per file instead of one g.add per triple
+    # lines are built a column at a time, there is no per-row Python loop
+    df = df[df["id"].notna()]
+    subjects = f"<{subject_prefix}" + df["id"].astype(str) + ">"
+    buf.write("".join(subjects + f" <{RDF.type}> <{subject_class}> .\n"))
+    for prop, col in properties.items():
+        mask = df[col].notna()
+        values = df[col][mask].astype(str).str.translate(NT_ESCAPE_TABLE)
+        suffix = f"\"{NT_DATATYPE_SUFFIX.get(df[col].dtype.kind, '')} .\n"
+        buf.write("".join(subjects[mask] + f" <{prop}> \"" + values + suffix))
+
+
+def add_links(buf: TextIO, df: pd.DataFrame, subject_class: URIRef, subject_prefix: str, links: Dict[URIRef, Tuple[str, str]]) -> None:
+    # same as add_triples, but the columns are ids of other resources
+    df = df[df["id"].notna()]
+    subjects = f"<{subject_prefix}" + df["id"].astype(str) + ">"
+    buf.write("".join(subjects + f" <{RDF.type}> <{subject_class}> .\n"))
+    for prop, (col, prefix) in links.items():
+        mask = df[col].notna()
+        buf.write("".join(subjects[mask] + f" <{prop}> <{prefix}" + df[col][mask].astype(str) + "> .\n"))
 
 
-def process_condition(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.Condition, EX.condition, {
+def process_condition(buf: TextIO, EX: Namespace, df: pd.DataFrame) -> None:
+    add_triples(buf, df, EX.Condition, EX.condition, {
         EX.name: "name",
         EX.source_id: "source_id",
         EX.url: "url"
     })
 
 
-def process_drug(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.Drug, EX.drug, {
+def process_drug(buf: TextIO, EX: Namespace, df: pd.DataFrame) -> None:
+    add_triples(buf, df, EX.Drug, EX.drug, {
         EX.name: "name",
         EX.wiki_url: "wiki_url",
         EX.drugbank_url: "drugbank_url"
     })
 
 
-def process_interaction(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    for _, row in df.iterrows():
-        interaction = URIRef(f"{EX.interaction}{row['id']}")
-        g.add((interaction, RDF.type, EX.Interaction))
-        g.add((interaction, EX.source_drug_id, URIRef(
-            f"{EX.drug}{row['source_drug_id']}")))
-        g.add((interaction, EX.target_drug_id, URIRef(
-            f"{EX.drug}{row['target_drug_id']}")))
+def process_interaction(buf: TextIO, EX: Namespace, df: pd.DataFrame) -> None:
+    add_links(buf, df, EX.Interaction, EX.interaction, {
+        EX.source_drug_id: ("source_drug_id", EX.drug),
+        EX.target_drug_id: ("target_drug_id", EX.drug)
+    })
 
 
-def process_manufacturer(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.Manufacturer, EX.manufacturer, {
+def process_manufacturer(buf: TextIO, EX: Namespace, df: pd.DataFrame) -> None:
+    add_triples(buf, df, EX.Manufacturer, EX.manufacturer, {
         EX.name: "name"
     })
 
 
-def process_price(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.Price, EX.price, {
+def process_price(buf: TextIO, EX: Namespace, df: pd.DataFrame) -> None:
+    add_triples(buf, df, EX.Price, EX.price, {
         EX.product_id: "product_id",
         EX.store_id: "store_id",
         EX.type: "type",
@@ -71,8 +99,8 @@ def process_price(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
     })
 
 
-def process_product(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.Product, EX.product, {
+def process_product(buf: TextIO, EX: Namespace, df: pd.DataFrame) -> None:
+    add_triples(buf, df, EX.Product, EX.product, {
         EX.source_id: "source_id",
         EX.drug_id: "drug_id",
         EX.name: "name",
@@ -83,28 +111,25 @@ def process_product(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
     })
 
 
-def process_source(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.Source, EX.source, {
+def process_source(buf: TextIO, EX: Namespace, df: pd.DataFrame) -> None:
+    add_triples(buf, df, EX.Source, EX.source, {
         EX.name: "name",
         EX.url: "url"
     })
 
 
-def process_store(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    add_triples(g, df, EX.Store, EX.store, {
+def process_store(buf: TextIO, EX: Namespace, df: pd.DataFrame) -> None:
+    add_triples(buf, df, EX.Store, EX.store, {
         EX.name: "name"
     })
 
 
-def process_treatment(g: Graph, EX: Namespace, df: pd.DataFrame) -> None:
-    for _, row in df.iterrows():
-        treatment = URIRef(f"{EX.treatment}{row['id']}")
-        g.add((treatment, RDF.type, EX.Treatment))
-        g.add((treatment, EX.source_id, URIRef(
-            f"{EX.source}{row['source_id']}")))
-        g.add((treatment, EX.condition_id, URIRef(
-            f"{EX.condition}{row['condition_id']}")))
-        g.add((treatment, EX.drug_id, URIRef(f"{EX.drug}{row['drug_id']}")))
+def process_treatment(buf: TextIO, EX: Namespace, df: pd.DataFrame) -> None:
+    add_links(buf, df, EX.Treatment, EX.treatment, {
+        EX.source_id: ("source_id", EX.source),
+        EX.condition_id: ("condition_id", EX.condition),
+        EX.drug_id: ("drug_id", EX.drug)
+    })
 
 ###################################################################################
 
@@ -115,25 +140,28 @@ def process_file(g: Graph, EX: Namespace, file_name: str, file_path: str) -> Non
 
     df = pd.read_csv(file_path, nrows=LINE_LIMIT)
 
+    buf = io.StringIO()
     match file_name:
         case "condition.csv":
-            process_condition(g, EX, df)
+            process_condition(buf, EX, df)
         case "drug.csv":
-            process_drug(g, EX, df)
+            process_drug(buf, EX, df)
         case "interaction.csv":
-            process_interaction(g, EX, df)
+            process_interaction(buf, EX, df)
         case "manufacturer.csv":
-            process_manufacturer(g, EX, df)
+            process_manufacturer(buf, EX, df)
         case "price.csv":
-            process_price(g, EX, df)
+            process_price(buf, EX, df)
         case "product.csv":
-            process_product(g, EX, df)
+            process_product(buf, EX, df)
         case "source.csv":
-            process_source(g, EX, df)
+            process_source(buf, EX, df)
         case "store.csv":
-            process_store(g, EX, df)
+            process_store(buf, EX, df)
         case "treatment.csv":
-            process_treatment(g, EX, df)
+            process_treatment(buf, EX, df)
+    # a single bulk parse per file
+    g.parse(data=buf.getvalue(), format="nt")
 
 ###################################################################################
 